@@ -2,7 +2,7 @@ from copy import deepcopy
 from enum import Enum, IntEnum
 from random import shuffle
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 FILLED_SQUARE = " ▣"
 EMPTY_SQUARE = " □"
@@ -21,6 +21,9 @@ START_BUTTON_COUNT = 5
 SHAPE_TO_MAKE_ROWS = 7
 SHAPE_TO_MAKE_COLS = 7
 FIRST_TO_MEET_GOAL_BONUS = 7
+# Bump whenever game logic changes so cached sweep results are replayed
+# 2: leather patches and the 7x7 goal bonus
+RULES_VERSION = 2
 # END GAME PARAMS
 
 
@@ -42,6 +45,38 @@ class SingleGameResults(BaseModel):
     player_achieved_goal: list[bool]
 
 
+class GameConfig(BaseModel):
+    # Defaults mirror the game params above so GameConfig() is the standard rule set
+    model_config = ConfigDict(frozen=True)
+
+    board_size: int = BOARD_SIZE
+    total_time_available: int = TOTAL_TIME_AVAILABLE
+    payday_locations: tuple[int, ...] = tuple(PAYDAY_LOCATIONS)
+    leather_locations: tuple[int, ...] = tuple(LEATHER_LOCATIONS)
+    pieces_to_lookahead: int = PIECES_TO_LOOKAHEAD
+    start_button_count: int = START_BUTTON_COUNT
+    shape_to_make_rows: int = SHAPE_TO_MAKE_ROWS
+    shape_to_make_cols: int = SHAPE_TO_MAKE_COLS
+    first_to_meet_goal_bonus: int = FIRST_TO_MEET_GOAL_BONUS
+
+
+DEFAULT_GAME_CONFIG = GameConfig()
+
+
+class TournamentCheckpoint(BaseModel):
+    # Games are played in order so games 0 to completed_games - 1 are done
+    completed_games: int
+    rounds_to_play: int
+    player_names: list[str]
+    config: GameConfig
+    # Running totals per player so the checkpoint stays the same size all run
+    total_scores: list[int]
+    total_wins: list[int]
+    total_goal_achievements: list[int]
+    # random.getstate() taken before the queue is shuffled for the next game
+    rng_state: list
+
+
 class PieceOrientation(BaseModel):
     shape: list
     rotation: Rotation
@@ -63,11 +98,6 @@ class PossiblePlayCoordinates(BaseModel):
     squares_to_fill: list[tuple[int, int]] | None
 
 
-class IsValidPlayModel(BaseModel):
-    is_valid_play: bool
-    squares_to_fill: list[tuple[int, int]] | None
-
-
 class PlayerChoice(BaseModel):
     piece_index: int
     piece_orientation_index: int
@@ -154,19 +184,28 @@ class Piece:
         shape.reverse()
 
 
+# Awarded to the first player whose time token passes each leather location
+LEATHER_PATCH = Piece(shape=[[True]], income=0, time_cost=0, button_cost=0)
+
+
 class PatchBoard:
-    def __init__(self):
-        self.board = [[False] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+    def __init__(self, config: GameConfig = DEFAULT_GAME_CONFIG):
+        self.config = config
+        self.board = [
+            [False] * config.board_size for _ in range(config.board_size)]
         self.total_income = 0
+        # Bit j of row_masks[i] is set when board[i][j] is filled
+        self.row_masks = [0] * config.board_size
+        self.goal_achieved = False
         # print(board)
 
     def place_piece(self, x: int, y: int, piece: PieceOrientation, income_to_add: int):
-        new_board = deepcopy(self.board)
+        # Check every square before filling any so a bad placement changes nothing
         for i, row in enumerate(piece.shape):
             for j, col in enumerate(row):
                 if col and (
-                    x + i >= BOARD_SIZE
-                    or y + j >= BOARD_SIZE
+                    x + i >= self.config.board_size
+                    or y + j >= self.config.board_size
                     or (self.board[x + i][y + j])
                 ):
                     raise Exception(
@@ -178,56 +217,57 @@ class PatchBoard:
                             )
                         }"
                     )
-                elif col:
-                    new_board[x + i][y + j] = col or self.board[x + i][y + j]
+        for i, row in enumerate(piece.shape):
+            for j, col in enumerate(row):
+                if col:
+                    self.board[x + i][y + j] = True
+                    self.row_masks[x + i] |= 1 << (y + j)
         self.total_income += income_to_add
-        self.board = new_board
+        if not self.goal_achieved:
+            self.update_goal_status(x, x + len(piece.shape) - 1)
 
-    def is_piece_able_to_be_placed(
-        self,
-        x: int,
-        y: int,
-        piece: PieceOrientation,
-        capture_squares_filled: bool = False,
-    ) -> IsValidPlayModel:
-        squares_to_fill = []
+    def reset(self):
+        for row in self.board:
+            for j in range(len(row)):
+                row[j] = False
+        for i in range(len(self.row_masks)):
+            self.row_masks[i] = 0
+        self.total_income = 0
+        self.goal_achieved = False
+
+    def can_place_piece(self, x: int, y: int, piece: PieceOrientation) -> bool:
         for i, row in enumerate(piece.shape):
             for j, col in enumerate(row):
-                squares_to_fill.append((x + i, y + j))
                 if (
-                    x + i >= BOARD_SIZE
-                    or y + j >= BOARD_SIZE
+                    x + i >= self.config.board_size
+                    or y + j >= self.config.board_size
                     or (self.board[x + i][y + j] and col)
                 ):
-                    return IsValidPlayModel(
-                        is_valid_play=False, squares_to_fill=squares_to_fill
-                    )
-        return IsValidPlayModel(is_valid_play=True, squares_to_fill=squares_to_fill)
+                    return False
+        return True
 
     def get_possible_plays_for_a_piece(
         self, piece: PieceOrientation, capture_squares_filled: bool = False
     ):
         plays_array = []
-        for x in range(BOARD_SIZE):
-            for y in range(BOARD_SIZE):
-                result = self.is_piece_able_to_be_placed(
-                    x, y, piece, capture_squares_filled
-                )
-                # TODO: fix the output of is_piece_able_to_be_placed. It's messy
-                if capture_squares_filled and result.is_valid_play:
-                    plays_array.append(
-                        PossiblePlayCoordinates(
-                            x_coordinate=x,
-                            y_coordinate=y,
-                            squares_to_fill=result.squares_to_fill,
-                        )
-                    )
-                elif not capture_squares_filled and result.is_valid_play:
-                    plays_array.append(
-                        PossiblePlayCoordinates(
-                            x_coordinate=x, y_coordinate=y, squares_to_fill=None
-                        )
+        for x in range(self.config.board_size):
+            for y in range(self.config.board_size):
+                # Only valid plays get a result object, most squares are rejected
+                if not self.can_place_piece(x, y, piece):
+                    continue
+                plays_array.append(
+                    PossiblePlayCoordinates(
+                        x_coordinate=x,
+                        y_coordinate=y,
+                        squares_to_fill=[
+                            (x + i, y + j)
+                            for i, row in enumerate(piece.shape)
+                            for j in range(len(row))
+                        ]
+                        if capture_squares_filled
+                        else None,
                     )
+                )
         return plays_array
 
     def get_empty_square_count(self):
@@ -237,8 +277,32 @@ class PatchBoard:
                 count += 1 if not col else 0
         return count
 
-    def has_achieved_goal(self):
-        pass
+    def update_goal_status(self, first_changed_row: int, last_changed_row: int):
+        # Only goal squares overlapping the changed rows can have been completed
+        goal_rows = self.config.shape_to_make_rows
+        goal_cols = self.config.shape_to_make_cols
+        board_size = self.config.board_size
+        if goal_rows > board_size or goal_cols > board_size:
+            return
+        first_top_row = max(0, first_changed_row - goal_rows + 1)
+        last_top_row = min(last_changed_row, board_size - goal_rows)
+        # Bit j is set when columns j to j + goal_cols - 1 of the row are all filled
+        row_starts = {}
+        for row in range(first_top_row, last_top_row + goal_rows):
+            starts = self.row_masks[row]
+            for k in range(1, goal_cols):
+                starts &= self.row_masks[row] >> k
+            row_starts[row] = starts
+        for top_row in range(first_top_row, last_top_row + 1):
+            starts = row_starts[top_row]
+            for k in range(1, goal_rows):
+                starts &= row_starts[top_row + k]
+            if starts:
+                self.goal_achieved = True
+                return
+
+    def has_achieved_goal(self) -> bool:
+        return self.goal_achieved
 
     def __repr__(self):
         shape_representation = ""
@@ -252,8 +316,15 @@ class PatchBoard:
 
 
 class PatchQueue:
-    def __init__(self, patch_array: list, randomize_queue: bool = False):
+    def __init__(
+        self,
+        patch_array: list,
+        randomize_queue: bool = False,
+        config: GameConfig = DEFAULT_GAME_CONFIG,
+    ):
+        self.config = config
         self.current_index = 0
+        self.lookaheads = []
         self.patch_array = patch_array
         self.gold_copy_patch_queue = deepcopy(patch_array)
         if randomize_queue:
@@ -263,21 +334,51 @@ class PatchQueue:
                 self.current_index = (i + 1) % len(self.patch_array)
 
     def reset_randomize_queue(self):
-        self.patch_array = deepcopy(self.gold_copy_patch_queue)
+        # Pieces are never modified during a game so the gold copy's objects are
+        # reused and only the list itself is refilled
+        self.patch_array[:] = self.gold_copy_patch_queue
         shuffle(self.patch_array)
         for i in range(len(self.patch_array)):
             if self.patch_array[i].is_start_piece:
                 self.current_index = (i + 1) % len(self.patch_array)
 
     def get_lookaheads(self):
-        lookaheads = []
-        for i in range(PIECES_TO_LOOKAHEAD):
+        # The same list is refilled every turn, callers must not hold on to it
+        self.lookaheads.clear()
+        for i in range(self.config.pieces_to_lookahead):
             # Wrap around case
-            lookaheads.append(
+            self.lookaheads.append(
                 self.patch_array[(self.current_index + i) %
                                  len(self.patch_array)]
             )
-        return lookaheads
+        return self.lookaheads
+
+    def get_lookahead_index(self, piece: Piece) -> int | None:
+        for i in range(self.config.pieces_to_lookahead):
+            index = (self.current_index + i) % len(self.patch_array)
+            if self.patch_array[index] is piece:
+                return i
+        return None
+
+    def peek_lookaheads_after_pop(self, selection_index: int | None) -> list[Piece]:
+        # What get_lookaheads returns next turn if selection_index is popped now,
+        # without touching the queue. None means nothing is popped
+        if selection_index is None:
+            return [
+                self.patch_array[(self.current_index + i) % len(self.patch_array)]
+                for i in range(self.config.pieces_to_lookahead)
+            ]
+        removed_index = (self.current_index + selection_index) % len(self.patch_array)
+        remaining_count = len(self.patch_array) - 1
+        if remaining_count == 0:
+            return []
+        next_lookaheads = []
+        for i in range(self.config.pieces_to_lookahead):
+            index = (self.current_index + selection_index + i) % remaining_count
+            next_lookaheads.append(
+                self.patch_array[index if index < removed_index else index + 1]
+            )
+        return next_lookaheads
 
     def pop_piece(self, selection_index: int):
         played_piece = self.patch_array.pop(
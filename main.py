@@ -1,15 +1,21 @@
+import argparse
+import hashlib
 import json
+import os
+import random
 
 # TODO: put what I actually need
 from game_structs import (
-    PAYDAY_LOCATIONS,
+    DEFAULT_GAME_CONFIG,
+    LEATHER_PATCH,
     PIECE_DEFS,
-    TOTAL_TIME_AVAILABLE,
+    GameConfig,
     GeneralOptions,
     PatchQueue,
     Piece,
     PlayerChoice,
     SingleGameResults,
+    TournamentCheckpoint,
 )
 from players import (
     MostEdgesTouching,
@@ -17,23 +23,53 @@ from players import (
     RandomChoice,
 )
 
+CHECKPOINT_FILE = "tournament_checkpoint.json"
+GAMES_PER_CHECKPOINT = 100
+# Shared by every turn with nothing affordable, it is never modified
+SKIP_CHOICE = PlayerChoice(
+    piece_index=GeneralOptions.SKIP,
+    piece_orientation_index=-1,
+    location=(-1, -1),
+)
+
 
 def generic_play(
-    piece_queue: PatchQueue, player_list: list[Player], print_results: bool = True
+    piece_queue: PatchQueue,
+    player_list: list[Player],
+    print_results: bool = True,
+    config: GameConfig | None = None,
 ) -> SingleGameResults:
+    if config is None:
+        config = piece_queue.config
+    # The board comes from each player's config and the lookahead from the queue's,
+    # so mixing rule sets would play a game no single config describes
+    if piece_queue.config != config or any(
+        player.config != config for player in player_list
+    ):
+        raise ValueError(
+            "The patch queue, every player and generic_play must share one GameConfig"
+        )
     next_player_index = 0
+    for player in player_list:
+        player.patch_queue = piece_queue
     player_order = [
         player_list[i].piece_location for i in range(len(player_list))]
     count = 0
     player_index_who_has_achieved_goal = -1
-    while any(player.piece_location < TOTAL_TIME_AVAILABLE for player in player_list):
+    leather_locations_claimed = set()
+    # Reused every turn rather than building new lists per turn
+    real_options = []
+    # TODO: maybe a better way to do this mapping
+    real_options_to_indices = []
+    # player_order tracks each player's location so this matches checking every player
+    while min(player_order) < config.total_time_available:
         count += 1
-        current_player: Player = player_list[next_player_index]
+        current_player_index = next_player_index
+        current_player: Player = player_list[current_player_index]
         previous_location = current_player.piece_location
         options = piece_queue.get_lookaheads()
-        real_options = []
-        # TODO: maybe a better way to do this mapping
-        real_options_to_indices = []
+        real_options.clear()
+        real_options_to_indices.clear()
         for index, piece in enumerate(options):
             if (
                 piece.button_cost <= current_player.button_count
@@ -44,11 +80,7 @@ def generic_play(
         player_choice: PlayerChoice = (
             current_player.make_choice(real_options)
             if len(real_options) > 0
-            else PlayerChoice(
-                piece_index=GeneralOptions.SKIP,
-                piece_orientation_index=-1,
-                location=(-1, -1),
-            )
+            else SKIP_CHOICE
         )
         if player_choice.piece_index == GeneralOptions.SKIP:
             if len(player_list) <= 1:
@@ -77,30 +109,60 @@ def generic_play(
             current_player.piece_location += played_piece.time_cost
         player_order[next_player_index] = current_player.piece_location
         next_player_index = player_order.index(min(player_order))
-        for payday in PAYDAY_LOCATIONS:
+        for payday in config.payday_locations:
             if previous_location < payday and current_player.piece_location >= payday:
                 current_player.button_count += current_player.patch_board.total_income
+        for leather_location in config.leather_locations:
+            if (
+                leather_location not in leather_locations_claimed
+                and previous_location
+                < leather_location
+                <= current_player.piece_location
+            ):
+                leather_locations_claimed.add(leather_location)
+                leather_choice = current_player.choose_leather_patch_placement(
+                    LEATHER_PATCH
+                )
+                if leather_choice.piece_index != GeneralOptions.SKIP:
+                    current_player.patch_board.place_piece(
+                        leather_choice.location[0],
+                        leather_choice.location[1],
+                        LEATHER_PATCH.shape_combinations[
+                            leather_choice.piece_orientation_index
+                        ],
+                        LEATHER_PATCH.income,
+                    )
+        if (
+            player_index_who_has_achieved_goal == -1
+            and current_player.patch_board.has_achieved_goal()
+        ):
+            player_index_who_has_achieved_goal = current_player_index
     if print_results:
         print("GAME COMPLETE")
     player_results = []
     player_who_won_index = -1
     best_score = None
     for i, player in enumerate(player_list):
+        # get_score adds the goal bonus to the buttons so it must only be called once
+        player_score = player.get_score(
+            is_first_to_meet_goal=i == player_index_who_has_achieved_goal
+        )
         if print_results:
             print(
                 f"Player: '{player.name}' (P{i + 1}) finished with {
-                    player.get_score()
+                    player_score
                 } points and the following board:\n{player.patch_board}"
             )
-        player_results.append(player.get_score())
+        player_results.append(player_score)
         # TODO: handle ties?
         if best_score is None or best_score < player_results[i]:
             player_who_won_index = i
             best_score = player_results[i]
     win_statuses = [False] * len(player_list)
     win_statuses[player_who_won_index] = True
-    # TODO: Need to do goal determinations
-    goal_statuses = [False] * len(player_list)
+    goal_statuses = [
+        i == player_index_who_has_achieved_goal for i in range(len(player_list))
+    ]
     return SingleGameResults(
         player_scores=player_results,
         player_win_statuses=win_statuses,
@@ -108,38 +170,96 @@ def generic_play(
     )
 
 
-def main():
+def load_pieces(piece_defs: str = PIECE_DEFS) -> list[Piece]:
+    with open(piece_defs, "r") as file:
+        pieces = json.loads(file.read())
+    return [Piece(**piece) for piece in pieces]
+
+
+def write_file_atomically(file_name: str, contents: str):
+    # Write then rename so a kill mid write leaves the previous file untouched
+    temp_file_name = f"{file_name}.tmp"
+    with open(temp_file_name, "w") as file:
+        file.write(contents)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_file_name, file_name)
+
+
+def get_file_hash(file_name: str) -> str:
+    with open(file_name, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def load_checkpoint(checkpoint_file: str = CHECKPOINT_FILE) -> TournamentCheckpoint:
+    with open(checkpoint_file, "r") as file:
+        return TournamentCheckpoint.model_validate_json(file.read())
+
+
+def main(
+    config: GameConfig = DEFAULT_GAME_CONFIG,
+    resume: bool = False,
+    checkpoint_file: str = CHECKPOINT_FILE,
+    games_per_checkpoint: int = GAMES_PER_CHECKPOINT,
+):
     print("Hello from patchwork-py!")
     # NOTE: uncomment to have repeated results
     # random.seed(15)
-    with open(PIECE_DEFS, "r") as file:
-        pieces = json.loads(file.read())
-    piece_queue = []
-    for piece in pieces:
-        new_piece = Piece(**piece)
-        piece_queue.append(new_piece)
+    piece_queue = load_pieces()
 
     rounds_to_play = 1000
-    player_1 = MostEdgesTouching()
-    player_2 = RandomChoice()
+    player_1 = MostEdgesTouching(config)
+    player_2 = RandomChoice(config)
     player_list: list[Player] = [player_1, player_2]
-    all_scores = [[] for _ in range(len(player_list))]
-    all_wins = [[] for _ in range(len(player_list))]
-    all_goal_achievements = [[] for _ in range(len(player_list))]
-    patch_queue = PatchQueue(piece_queue, randomize_queue=True)
+    total_scores = [0] * len(player_list)
+    total_wins = [0] * len(player_list)
+    total_goal_achievements = [0] * len(player_list)
+    patch_queue = PatchQueue(piece_queue, randomize_queue=True, config=config)
+    completed_games = 0
+    if resume and not os.path.exists(checkpoint_file):
+        print(f"--- NO CHECKPOINT FOUND AT {checkpoint_file}, STARTING FRESH ---")
+    elif resume:
+        checkpoint = load_checkpoint(checkpoint_file)
+        player_names = [player.name for player in player_list]
+        if checkpoint.player_names != player_names or checkpoint.config != config:
+            raise ValueError(
+                f"Checkpoint {checkpoint_file} was made for {
+                    checkpoint.player_names
+                } with {checkpoint.config}, not {player_names} with {config}"
+            )
+        completed_games = checkpoint.completed_games
+        rounds_to_play = checkpoint.rounds_to_play
+        total_scores = checkpoint.total_scores
+        total_wins = checkpoint.total_wins
+        total_goal_achievements = checkpoint.total_goal_achievements
+        version, internal_state, gauss_next = checkpoint.rng_state
+        random.setstate((version, tuple(internal_state), gauss_next))
+        patch_queue.reset_randomize_queue()
+        print(f"--- RESUMING AFTER GAME {completed_games - 1} ---")
     print("--- STARTING GAMES ---")
-    for i in range(rounds_to_play):
+    for i in range(completed_games, rounds_to_play):
         single_game_results: SingleGameResults = generic_play(
-            patch_queue, player_list, print_results=False
+            patch_queue, player_list, print_results=False, config=config
         )
         # print(f"RESULTS{i}: {single_game_results}")
         for j in range(len(single_game_results.player_scores)):
             #    print(f"APPENDING TO {j}: {single_game_results.player_scores[j]}")
-            all_scores[j].append(single_game_results.player_scores[j])
-            all_wins[j].append(single_game_results.player_win_statuses[j])
-            all_goal_achievements[j].append(
-                single_game_results.player_achieved_goal[j])
+            total_scores[j] += single_game_results.player_scores[j]
+            total_wins[j] += single_game_results.player_win_statuses[j]
+            total_goal_achievements[j] += single_game_results.player_achieved_goal[j]
             player_list[j].reset_player()
+        if (i + 1) % games_per_checkpoint == 0 or i + 1 == rounds_to_play:
+            checkpoint = TournamentCheckpoint(
+                completed_games=i + 1,
+                rounds_to_play=rounds_to_play,
+                player_names=[player.name for player in player_list],
+                config=config,
+                total_scores=total_scores,
+                total_wins=total_wins,
+                total_goal_achievements=total_goal_achievements,
+                rng_state=list(random.getstate()),
+            )
+            write_file_atomically(checkpoint_file, checkpoint.model_dump_json())
         patch_queue.reset_randomize_queue()
         if i % 100 == 0:
             print(f"GAME {i} COMPLETE...")
@@ -147,12 +267,27 @@ def main():
     for i, player in enumerate(player_list):
         print(
             f"{player.name} (P{i + 1}) averaged: {
-                sum(all_scores[i]) / rounds_to_play
-            }, won {sum(all_wins[i])} rounds, and won {
-                sum(all_goal_achievements[i])
+                total_scores[i] / rounds_to_play
+            }, won {total_wins[i]} rounds, and won {
+                total_goal_achievements[i]
             } goals over {rounds_to_play} games."
         )
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue from the last checkpoint instead of starting over",
+    )
+    parser.add_argument("--checkpoint-file", default=CHECKPOINT_FILE)
+    parser.add_argument(
+        "--games-per-checkpoint", type=int, default=GAMES_PER_CHECKPOINT
+    )
+    args = parser.parse_args()
+    main(
+        resume=args.resume,
+        checkpoint_file=args.checkpoint_file,
+        games_per_checkpoint=args.games_per_checkpoint,
+    )
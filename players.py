@@ -3,11 +3,11 @@ from random import randint, randrange
 from pydantic import BaseModel
 
 from game_structs import (
-    BOARD_SIZE,
-    FIRST_TO_MEET_GOAL_BONUS,
-    START_BUTTON_COUNT,
+    DEFAULT_GAME_CONFIG,
+    GameConfig,
     GeneralOptions,
     PatchBoard,
+    PatchQueue,
     Piece,
     PieceOrientation,
     PlayerChoice,
@@ -18,24 +18,54 @@ from game_structs import (
 class Player:
     name = "Player"
 
-    def __init__(self):
-        self.patch_board = PatchBoard()
+    def __init__(self, config: GameConfig = DEFAULT_GAME_CONFIG):
+        self.config = config
+        self.patch_board = PatchBoard(config)
+        # Set by generic_play for strategies that want to look further down the queue
+        self.patch_queue: PatchQueue | None = None
         self.piece_location = 0
-        self.button_count = START_BUTTON_COUNT
+        self.button_count = config.start_button_count
 
     def get_score(self, is_first_to_meet_goal: bool = False):
         if is_first_to_meet_goal:
-            self.button_count += FIRST_TO_MEET_GOAL_BONUS
+            self.button_count += self.config.first_to_meet_goal_bonus
         return self.button_count + (self.patch_board.get_empty_square_count() * -2)
 
     def reset_player(self):
-        self.patch_board = PatchBoard()
+        self.patch_board.reset()
         self.piece_location = 0
-        self.button_count = START_BUTTON_COUNT
+        self.button_count = self.config.start_button_count
+
+    @classmethod
+    def get_strategy_fingerprint(cls) -> str:
+        # Anything outside the code that changes how this strategy plays, e.g. weights
+        return ""
 
     def make_choice(self, options) -> PlayerChoice:
         raise NotImplementedError
 
+    def choose_leather_patch_placement(self, leather_patch: Piece) -> PlayerChoice:
+        possible_plays = self.patch_board.get_possible_plays_for_a_piece(
+            leather_patch.shape_combinations[0]
+        )
+        # A full board has nowhere to put the patch so the award is skipped
+        if len(possible_plays) == 0:
+            return PlayerChoice(
+                piece_index=GeneralOptions.SKIP.value,
+                piece_orientation_index=-1,
+                location=(-1, -1),
+            )
+        player_choice = self.make_choice([leather_patch])
+        if player_choice.piece_index != GeneralOptions.SKIP:
+            return player_choice
+        # Leather patches can't be turned down so fall back to the first open square
+        return PlayerChoice(
+            piece_index=0,
+            piece_orientation_index=0,
+            location=(possible_plays[0].x_coordinate,
+                      possible_plays[0].y_coordinate),
+        )
+
 
 class AlwaysSkip(Player):
     name = "Always Skipt"
@@ -53,8 +83,8 @@ class FirstChoice(Player):
 
     def make_choice(self, options) -> PlayerChoice:
         for i, piece in enumerate(options):
-            for k in range(BOARD_SIZE):
-                for j in range(BOARD_SIZE):
+            for k in range(self.config.board_size):
+                for j in range(self.config.board_size):
                     for _ in range(4):
                         piece_orientation_index = randrange(
                             len(piece.shape_combinations)
@@ -138,18 +168,19 @@ class MostEdgesTouching(Player):
     name = "Most Edges Touching"
 
     def make_choice(self, options: list[Piece]) -> PlayerChoice:
+        board_size = self.config.board_size
         optimal_squares_to_fill = []
-        for x in range(BOARD_SIZE):
-            for y in range(BOARD_SIZE):
+        for x in range(board_size):
+            for y in range(board_size):
                 if not self.patch_board.board[x][y]:
                     continue
                 if x - 1 >= 0 and not self.patch_board.board[x - 1][y]:
                     optimal_squares_to_fill.append((x - 1, y))
-                if x + 1 < BOARD_SIZE and not self.patch_board.board[x + 1][y]:
+                if x + 1 < board_size and not self.patch_board.board[x + 1][y]:
                     optimal_squares_to_fill.append((x + 1, y))
                 if y - 1 >= 0 and not self.patch_board.board[x][y - 1]:
                     optimal_squares_to_fill.append((x, y - 1))
-                if y + 1 < BOARD_SIZE and not self.patch_board.board[x][y + 1]:
+                if y + 1 < board_size and not self.patch_board.board[x][y + 1]:
                     optimal_squares_to_fill.append((x, y + 1))
         is_initial_play = False
         if len(optimal_squares_to_fill) == 0:
@@ -167,7 +198,7 @@ class MostEdgesTouching(Player):
                 possible_plays_array = self.patch_board.get_possible_plays_for_a_piece(
                     piece.shape_combinations[j], capture_squares_filled=True
                 )
-                if is_initial_play:
+                if is_initial_play and len(possible_plays_array) > 0:
                     inital_play: PossiblePlayCoordinates = possible_plays_array[0]
                     return PlayerChoice(
                         piece_index=i,
@@ -201,18 +232,19 @@ class MinimizeTimeThenMostEdgesTouchingWithSelectedPiece(Player):
     name = "Minimize Time then Maximize Edges Touching"
 
     def make_choice(self, options: list[Piece]) -> PlayerChoice:
+        board_size = self.config.board_size
         optimal_squares_to_fill = []
-        for x in range(BOARD_SIZE):
-            for y in range(BOARD_SIZE):
+        for x in range(board_size):
+            for y in range(board_size):
                 if not self.patch_board.board[x][y]:
                     continue
                 if x - 1 >= 0 and not self.patch_board.board[x - 1][y]:
                     optimal_squares_to_fill.append((x - 1, y))
-                if x + 1 < BOARD_SIZE and not self.patch_board.board[x + 1][y]:
+                if x + 1 < board_size and not self.patch_board.board[x + 1][y]:
                     optimal_squares_to_fill.append((x + 1, y))
                 if y - 1 >= 0 and not self.patch_board.board[x][y - 1]:
                     optimal_squares_to_fill.append((x, y - 1))
-                if y + 1 < BOARD_SIZE and not self.patch_board.board[x][y + 1]:
+                if y + 1 < board_size and not self.patch_board.board[x][y + 1]:
                     optimal_squares_to_fill.append((x, y + 1))
         is_initial_play = False
         if len(optimal_squares_to_fill) == 0:
@@ -232,7 +264,7 @@ class MinimizeTimeThenMostEdgesTouchingWithSelectedPiece(Player):
                 possible_plays_array = self.patch_board.get_possible_plays_for_a_piece(
                     piece.shape_combinations[j], capture_squares_filled=True
                 )
-                if is_initial_play:
+                if is_initial_play and len(possible_plays_array) > 0:
                     inital_play: PossiblePlayCoordinates = possible_plays_array[0]
                     return PlayerChoice(
                         piece_index=piece_index,
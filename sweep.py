@@ -0,0 +1,194 @@
+import hashlib
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pydantic import BaseModel
+
+from game_structs import (
+    DEFAULT_GAME_CONFIG,
+    PIECE_DEFS,
+    RULES_VERSION,
+    GameConfig,
+    PatchQueue,
+    SingleGameResults,
+)
+from main import (
+    generic_play,
+    get_file_hash,
+    load_pieces,
+    write_file_atomically,
+)
+from players import (
+    AlwaysSkip,
+    CheapestPieceRandomPlacement,
+    FirstChoice,
+    MinimizeTimeThenMostEdgesTouchingWithSelectedPiece,
+    MostEdgesTouching,
+    Player,
+    RandomChoice,
+)
+from value_function import ValueFunctionPlayer
+
+SWEEP_CACHE_DIR = "sweep_cache"
+STRATEGIES: dict[str, type[Player]] = {
+    strategy.__name__: strategy
+    for strategy in [
+        AlwaysSkip,
+        CheapestPieceRandomPlacement,
+        FirstChoice,
+        MinimizeTimeThenMostEdgesTouchingWithSelectedPiece,
+        MostEdgesTouching,
+        RandomChoice,
+        ValueFunctionPlayer,
+    ]
+}
+
+
+class SweepCell(BaseModel):
+    config: GameConfig
+    strategy_pair: tuple[str, str]
+    seed: int
+    # Part of the cache key so rule or weight changes don't reuse stale results
+    rules_version: int = RULES_VERSION
+    piece_defs_hash: str = ""
+    strategy_fingerprints: tuple[str, str] = ("", "")
+
+    def cache_key(self) -> str:
+        return hashlib.sha256(self.model_dump_json().encode()).hexdigest()
+
+
+class SweepCellResult(BaseModel):
+    cell: SweepCell
+    results: SingleGameResults
+
+
+def build_config_grid(
+    base_config: GameConfig = DEFAULT_GAME_CONFIG, **param_values: list
+) -> list[GameConfig]:
+    # Every combination of the given values, e.g. start_button_count=[5, 7]
+    param_names = list(param_values)
+    return [
+        GameConfig.model_validate(
+            {**base_config.model_dump(), **dict(zip(param_names, values))}
+        )
+        for values in itertools.product(*param_values.values())
+    ]
+
+
+def play_cell(cell: SweepCell) -> SweepCellResult:
+    # Seeding before the queue shuffle makes the whole game repeatable per cell
+    random.seed(cell.seed)
+    patch_queue = PatchQueue(load_pieces(), randomize_queue=True, config=cell.config)
+    player_list = [STRATEGIES[name](cell.config) for name in cell.strategy_pair]
+    results = generic_play(
+        patch_queue, player_list, print_results=False, config=cell.config
+    )
+    return SweepCellResult(cell=cell, results=results)
+
+
+def get_cache_path(cache_dir: str, cell: SweepCell) -> str:
+    return os.path.join(cache_dir, f"{cell.cache_key()}.json")
+
+
+def load_cached_result(cache_dir: str, cell: SweepCell) -> SweepCellResult | None:
+    cache_path = get_cache_path(cache_dir, cell)
+    if not os.path.exists(cache_path):
+        return None
+    with open(cache_path, "r") as file:
+        return SweepCellResult.model_validate_json(file.read())
+
+
+def save_cached_result(cache_dir: str, result: SweepCellResult):
+    write_file_atomically(
+        get_cache_path(cache_dir, result.cell), result.model_dump_json()
+    )
+
+
+def run_sweep(
+    configs: list[GameConfig],
+    strategy_pairs: list[tuple[str, str]],
+    seeds: list[int],
+    cache_dir: str = SWEEP_CACHE_DIR,
+    max_workers: int | None = None,
+) -> list[SweepCellResult]:
+    os.makedirs(cache_dir, exist_ok=True)
+    piece_defs_hash = get_file_hash(PIECE_DEFS)
+    cells = [
+        SweepCell(
+            config=config,
+            strategy_pair=strategy_pair,
+            seed=seed,
+            piece_defs_hash=piece_defs_hash,
+            strategy_fingerprints=tuple(
+                STRATEGIES[name].get_strategy_fingerprint() for name in strategy_pair
+            ),
+        )
+        for config, strategy_pair, seed in itertools.product(
+            configs, strategy_pairs, seeds
+        )
+    ]
+    results_by_key: dict[str, SweepCellResult] = {}
+    cells_to_play = []
+    for cell in cells:
+        cached_result = load_cached_result(cache_dir, cell)
+        if cached_result is None:
+            cells_to_play.append(cell)
+        else:
+            results_by_key[cell.cache_key()] = cached_result
+    print(
+        f"SWEEP: {len(cells)} cells, {len(results_by_key)} cached, {
+            len(cells_to_play)
+        } to play"
+    )
+    failed_cells = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(play_cell, cell): cell for cell in cells_to_play}
+        # Cells are saved as they finish so a rerun only plays what is missing
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as error:
+                print(f"SWEEP CELL FAILED: {futures[future]}\n{error!r}")
+                failed_cells.append(futures[future])
+                continue
+            save_cached_result(cache_dir, result)
+            results_by_key[result.cell.cache_key()] = result
+    if len(failed_cells) > 0:
+        raise RuntimeError(
+            f"{len(failed_cells)} of {len(cells_to_play)} sweep cells failed, "
+            "the rest are cached so a rerun only retries these"
+        )
+    return [results_by_key[cell.cache_key()] for cell in cells]
+
+
+def print_sweep_summary(results: list[SweepCellResult]):
+    grouped_results: dict[tuple[str, tuple[str, str]], list[SingleGameResults]] = {}
+    for result in results:
+        group_key = (result.cell.config.model_dump_json(), result.cell.strategy_pair)
+        grouped_results.setdefault(group_key, []).append(result.results)
+    for (config_json, strategy_pair), game_results in grouped_results.items():
+        print(f"CONFIG: {config_json}")
+        for i, strategy_name in enumerate(strategy_pair):
+            average_score = sum(
+                game.player_scores[i] for game in game_results
+            ) / len(game_results)
+            wins = sum(game.player_win_statuses[i] for game in game_results)
+            print(
+                f"    {strategy_name} (P{i + 1}) averaged: {average_score}, won {
+                    wins
+                } rounds over {len(game_results)} games."
+            )
+
+
+def main():
+    configs = build_config_grid(
+        start_button_count=[5, 7], pieces_to_lookahead=[3, 4])
+    strategy_pairs = [("MostEdgesTouching", "RandomChoice")]
+    results = run_sweep(configs, strategy_pairs, seeds=list(range(100)))
+    print_sweep_summary(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import gc
+import random
+import tracemalloc
+
+import pytest
+
+from game_structs import DEFAULT_GAME_CONFIG, PatchQueue, Piece, PlayerChoice
+from main import generic_play, load_pieces
+from players import MostEdgesTouching, Player, RandomChoice
+
+WARM_UP_GAMES = 3
+MEASURED_GAMES = 10
+# Steady state games reuse boards, queue and buffers so almost nothing is kept
+MAX_NET_GROWTH_BYTES = 64 * 1024
+# Deep copying the piece list every game alone pushed this past 350 KB
+MAX_PEAK_BYTES_PER_GAME = 256 * 1024
+
+
+def play_pooled_game(patch_queue: PatchQueue, player_list: list[Player]):
+    generic_play(patch_queue, player_list, print_results=False)
+    for player in player_list:
+        player.reset_player()
+    patch_queue.reset_randomize_queue()
+
+
+def set_up_warm_game() -> tuple[PatchQueue, list[Player]]:
+    random.seed(0)
+    patch_queue = PatchQueue(load_pieces(), randomize_queue=True)
+    player_list: list[Player] = [MostEdgesTouching(), RandomChoice()]
+    for _ in range(WARM_UP_GAMES):
+        play_pooled_game(patch_queue, player_list)
+    return patch_queue, player_list
+
+
+def test_steady_state_games_do_not_grow_memory():
+    patch_queue, player_list = set_up_warm_game()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        for _ in range(MEASURED_GAMES):
+            play_pooled_game(patch_queue, player_list)
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    net_growth = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    assert net_growth < MAX_NET_GROWTH_BYTES
+
+
+def test_peak_memory_per_game_is_bounded():
+    patch_queue, player_list = set_up_warm_game()
+    tracemalloc.start()
+    try:
+        for _ in range(MEASURED_GAMES):
+            tracemalloc.reset_peak()
+            current_before_game, _ = tracemalloc.get_traced_memory()
+            play_pooled_game(patch_queue, player_list)
+            _, peak = tracemalloc.get_traced_memory()
+            assert peak - current_before_game < MAX_PEAK_BYTES_PER_GAME
+    finally:
+        tracemalloc.stop()
+
+
+class RecordsLeatherAwards(Player):
+    # (their location, every other player's location) at each award
+    awards: list[tuple[int, list[int]]]
+    player_list: list[Player]
+
+    def choose_leather_patch_placement(self, leather_patch: Piece) -> PlayerChoice:
+        self.awards.append(
+            (
+                self.piece_location,
+                [
+                    player.piece_location
+                    for player in self.player_list
+                    if player is not self
+                ],
+            )
+        )
+        return super().choose_leather_patch_placement(leather_patch)
+
+
+class RecordingMostEdgesTouching(RecordsLeatherAwards, MostEdgesTouching):
+    pass
+
+
+class RecordingRandomChoice(RecordsLeatherAwards, RandomChoice):
+    pass
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_each_leather_patch_goes_once_to_the_first_player_to_cross_it(seed: int):
+    random.seed(seed)
+    awards = []
+    player_list: list[Player] = [RecordingMostEdgesTouching(), RecordingRandomChoice()]
+    for player in player_list:
+        player.awards = awards
+        player.player_list = player_list
+    patch_queue = PatchQueue(load_pieces(), randomize_queue=True)
+    generic_play(patch_queue, player_list, print_results=False)
+    leather_locations = DEFAULT_GAME_CONFIG.leather_locations
+    # Lower locations are always crossed first so awards come in location order
+    assert len(awards) == len(leather_locations)
+    for leather_location, (location, other_locations) in zip(
+        leather_locations, awards
+    ):
+        assert location >= leather_location
+        assert all(
+            other_location < leather_location for other_location in other_locations
+        )
@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from game_structs import LEATHER_PATCH, GameConfig, PatchBoard
+from main import load_pieces
+
+BOARDS_PER_CONFIG = 200
+GOAL_CONFIGS = [
+    GameConfig(),
+    GameConfig(board_size=6, shape_to_make_rows=3, shape_to_make_cols=4),
+    GameConfig(board_size=5, shape_to_make_rows=5, shape_to_make_cols=2),
+    GameConfig(board_size=4, shape_to_make_rows=1, shape_to_make_cols=1),
+]
+
+
+def has_filled_goal_square(patch_board: PatchBoard) -> bool:
+    config = patch_board.config
+    goal_rows = config.shape_to_make_rows
+    goal_cols = config.shape_to_make_cols
+    return any(
+        all(
+            patch_board.board[top_row + i][left_col + j]
+            for i in range(goal_rows)
+            for j in range(goal_cols)
+        )
+        for top_row in range(config.board_size - goal_rows + 1)
+        for left_col in range(config.board_size - goal_cols + 1)
+    )
+
+
+@pytest.mark.parametrize("config", GOAL_CONFIGS)
+def test_goal_matches_brute_force_scan(config: GameConfig):
+    random.seed(config.board_size)
+    orientations = [
+        orientation
+        for piece in load_pieces()
+        for orientation in piece.shape_combinations
+    ]
+    leather_orientation = LEATHER_PATCH.shape_combinations[0]
+    for _ in range(BOARDS_PER_CONFIG):
+        patch_board = PatchBoard(config)
+        while patch_board.get_empty_square_count() > 0:
+            orientation = random.choice(orientations)
+            possible_plays = patch_board.get_possible_plays_for_a_piece(orientation)
+            # Single squares once big pieces stop fitting so boards fill right up
+            if len(possible_plays) == 0:
+                orientation = leather_orientation
+                possible_plays = patch_board.get_possible_plays_for_a_piece(
+                    orientation
+                )
+            play = random.choice(possible_plays)
+            patch_board.place_piece(
+                play.x_coordinate, play.y_coordinate, orientation, 0
+            )
+            assert patch_board.has_achieved_goal() == has_filled_goal_square(
+                patch_board
+            )
+
+
+def test_goal_is_never_met_on_a_board_smaller_than_the_goal():
+    patch_board = PatchBoard(GameConfig(board_size=3))
+    for x in range(3):
+        for y in range(3):
+            patch_board.place_piece(x, y, LEATHER_PATCH.shape_combinations[0], 0)
+    assert not patch_board.has_achieved_goal()
+
+
+def test_reset_clears_goal():
+    patch_board = PatchBoard(
+        GameConfig(board_size=3, shape_to_make_rows=1, shape_to_make_cols=1)
+    )
+    patch_board.place_piece(0, 0, LEATHER_PATCH.shape_combinations[0], 0)
+    assert patch_board.has_achieved_goal()
+    patch_board.reset()
+    assert not patch_board.has_achieved_goal()
+    assert has_filled_goal_square(patch_board) is False
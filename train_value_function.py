@@ -0,0 +1,146 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from game_structs import DEFAULT_GAME_CONFIG, GameConfig, PatchQueue
+from main import generic_play, load_pieces
+from players import MostEdgesTouching, Player
+from value_function import (
+    VALUE_WEIGHTS_FILE,
+    ValueFunctionPlayer,
+    ValueModel,
+    get_feature_count,
+)
+
+
+def play_self_play_games(
+    model: ValueModel,
+    games_to_play: int,
+    seed: int,
+    exploration_rate: float,
+    config: GameConfig = DEFAULT_GAME_CONFIG,
+) -> tuple[np.ndarray, np.ndarray]:
+    # Each chosen post-move state is labelled with that player's final score margin
+    random.seed(seed)
+    player_list = [
+        ValueFunctionPlayer(
+            config, model, exploration_rate=exploration_rate, record_positions=True
+        )
+        for _ in range(2)
+    ]
+    patch_queue = PatchQueue(load_pieces(), randomize_queue=True, config=config)
+    all_features = []
+    all_targets = []
+    for _ in range(games_to_play):
+        single_game_results = generic_play(
+            patch_queue, player_list, print_results=False, config=config
+        )
+        scores = single_game_results.player_scores
+        for i, player in enumerate(player_list):
+            margin = scores[i] - max(
+                score for j, score in enumerate(scores) if j != i)
+            all_features += player.recorded_features
+            all_targets += [margin] * len(player.recorded_features)
+            player.reset_player()
+        patch_queue.reset_randomize_queue()
+    return np.array(all_features), np.array(all_targets, dtype=np.float64)
+
+
+def generate_training_positions(
+    model: ValueModel,
+    games_to_play: int,
+    seed: int,
+    exploration_rate: float,
+    config: GameConfig = DEFAULT_GAME_CONFIG,
+    games_per_worker: int = 25,
+    max_workers: int | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    worker_seeds = [
+        seed + i for i in range(0, games_to_play, games_per_worker)]
+    worker_games = [
+        min(games_per_worker, games_to_play - i)
+        for i in range(0, games_to_play, games_per_worker)
+    ]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        worker_results = list(
+            executor.map(
+                play_self_play_games,
+                [model] * len(worker_seeds),
+                worker_games,
+                worker_seeds,
+                [exploration_rate] * len(worker_seeds),
+                [config] * len(worker_seeds),
+            )
+        )
+    return (
+        np.concatenate([features for features, _ in worker_results]),
+        np.concatenate([targets for _, targets in worker_results]),
+    )
+
+
+def train_value_function(
+    iterations: int = 5,
+    games_per_iteration: int = 200,
+    hidden_size: int = 0,
+    exploration_rate: float = 0.1,
+    seed: int = 0,
+    config: GameConfig = DEFAULT_GAME_CONFIG,
+    max_workers: int | None = None,
+) -> ValueModel:
+    model = ValueModel(get_feature_count(config), hidden_size=hidden_size)
+    all_features = []
+    all_targets = []
+    for iteration in range(iterations):
+        # The untrained model has nothing to go on so the first round is all random
+        features, targets = generate_training_positions(
+            model,
+            games_per_iteration,
+            seed + iteration * games_per_iteration,
+            1.0 if iteration == 0 else exploration_rate,
+            config=config,
+            max_workers=max_workers,
+        )
+        all_features.append(features)
+        all_targets.append(targets)
+        model.fit(np.concatenate(all_features), np.concatenate(all_targets))
+        print(
+            f"ITERATION {iteration} COMPLETE: trained on {
+                sum(len(targets) for targets in all_targets)
+            } positions"
+        )
+    return model
+
+
+def evaluate_against(
+    model: ValueModel,
+    opponent: Player,
+    games_to_play: int = 100,
+    config: GameConfig = DEFAULT_GAME_CONFIG,
+):
+    player_list: list[Player] = [ValueFunctionPlayer(config, model), opponent]
+    patch_queue = PatchQueue(load_pieces(), randomize_queue=True, config=config)
+    wins = 0
+    for _ in range(games_to_play):
+        single_game_results = generic_play(
+            patch_queue, player_list, print_results=False, config=config
+        )
+        wins += single_game_results.player_win_statuses[0]
+        for player in player_list:
+            player.reset_player()
+        patch_queue.reset_randomize_queue()
+    print(
+        f"{player_list[0].name} won {wins} of {games_to_play} games against {
+            opponent.name
+        }"
+    )
+
+
+def main():
+    model = train_value_function()
+    model.save(VALUE_WEIGHTS_FILE)
+    evaluate_against(model, MostEdgesTouching())
+
+
+if __name__ == "__main__":
+    main()
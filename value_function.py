@@ -0,0 +1,321 @@
+import os
+from random import random, randrange
+
+import numpy as np
+
+from game_structs import (
+    DEFAULT_GAME_CONFIG,
+    GameConfig,
+    GeneralOptions,
+    Piece,
+    PlayerChoice,
+)
+from main import get_file_hash
+from players import Player
+
+VALUE_WEIGHTS_FILE = "value_weights.npz"
+# Per piece in the next lookahead window: button cost, time cost, income and squares
+LOOKAHEAD_PIECE_FEATURES = 4
+# Buttons, income, position, empty squares, paydays left, income still to collect, bias
+STATE_FEATURES = 7
+
+
+def get_feature_count(config: GameConfig = DEFAULT_GAME_CONFIG) -> int:
+    return (
+        config.board_size * config.board_size
+        + STATE_FEATURES
+        + config.pieces_to_lookahead * LOOKAHEAD_PIECE_FEATURES
+    )
+
+
+class ValueModel:
+    # hidden_size of 0 is a plain linear model, anything else is a single tanh layer
+    def __init__(
+        self,
+        feature_count: int,
+        hidden_size: int = 0,
+        weights: dict[str, np.ndarray] | None = None,
+    ):
+        self.feature_count = feature_count
+        self.hidden_size = hidden_size
+        if weights is not None:
+            self.weights = weights
+        elif hidden_size == 0:
+            self.weights = {"output": np.zeros(feature_count)}
+        else:
+            rng = np.random.default_rng()
+            self.weights = {
+                "hidden": rng.normal(
+                    0, 1 / np.sqrt(feature_count), (feature_count, hidden_size)
+                ),
+                "hidden_bias": np.zeros(hidden_size),
+                "output": np.zeros(hidden_size),
+                "output_bias": np.zeros(1),
+            }
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        if self.hidden_size == 0:
+            return features @ self.weights["output"]
+        hidden = np.tanh(
+            features @ self.weights["hidden"] + self.weights["hidden_bias"])
+        return hidden @ self.weights["output"] + self.weights["output_bias"][0]
+
+    def fit(
+        self,
+        features: np.ndarray,
+        targets: np.ndarray,
+        l2_penalty: float = 1.0,
+        epochs: int = 50,
+        batch_size: int = 256,
+        learning_rate: float = 0.01,
+    ):
+        if self.hidden_size == 0:
+            # Closed form ridge regression
+            regularizer = l2_penalty * np.eye(self.feature_count)
+            self.weights["output"] = np.linalg.solve(
+                features.T @ features + regularizer, features.T @ targets
+            )
+            return
+        # Train on standardized targets and fold the scale back into the output layer
+        target_mean = targets.mean()
+        target_std = targets.std() or 1.0
+        scaled_targets = (targets - target_mean) / target_std
+        self.weights["output"] = self.weights["output"] * 0
+        self.weights["output_bias"][0] = 0.0
+        rng = np.random.default_rng()
+        for _ in range(epochs):
+            order = rng.permutation(len(features))
+            for start in range(0, len(features), batch_size):
+                batch = order[start: start + batch_size]
+                batch_features = features[batch]
+                hidden = np.tanh(
+                    batch_features @ self.weights["hidden"]
+                    + self.weights["hidden_bias"]
+                )
+                errors = (
+                    hidden @ self.weights["output"]
+                    + self.weights["output_bias"][0]
+                    - scaled_targets[batch]
+                ) / len(batch)
+                hidden_errors = np.outer(errors, self.weights["output"]) * (
+                    1 - hidden**2
+                )
+                self.weights["output"] -= learning_rate * (
+                    hidden.T @ errors
+                    + l2_penalty / len(features) * self.weights["output"]
+                )
+                self.weights["output_bias"][0] -= learning_rate * errors.sum()
+                self.weights["hidden"] -= learning_rate * (
+                    batch_features.T @ hidden_errors
+                    + l2_penalty / len(features) * self.weights["hidden"]
+                )
+                self.weights["hidden_bias"] -= learning_rate * hidden_errors.sum(axis=0)
+        self.weights["output"] = self.weights["output"] * target_std
+        self.weights["output_bias"][0] = target_mean
+
+    def save(self, file_name: str = VALUE_WEIGHTS_FILE):
+        np.savez(file_name, hidden_size=self.hidden_size, **self.weights)
+
+    @classmethod
+    def load(cls, file_name: str = VALUE_WEIGHTS_FILE) -> "ValueModel":
+        with np.load(file_name) as saved:
+            weights = {
+                name: saved[name] for name in saved.files if name != "hidden_size"
+            }
+            hidden_size = int(saved["hidden_size"])
+        feature_count = len(
+            weights["output"] if hidden_size == 0 else weights["hidden"])
+        return cls(feature_count, hidden_size=hidden_size, weights=weights)
+
+
+class ValueFunctionPlayer(Player):
+    name = "Value Function"
+
+    def __init__(
+        self,
+        config: GameConfig = DEFAULT_GAME_CONFIG,
+        model: ValueModel | None = None,
+        exploration_rate: float = 0.0,
+        record_positions: bool = False,
+    ):
+        super().__init__(config)
+        if model is None:
+            # An untrained model would score every move the same, so refuse to play
+            if not os.path.exists(VALUE_WEIGHTS_FILE):
+                raise FileNotFoundError(
+                    f"No trained weights at {VALUE_WEIGHTS_FILE}, run "
+                    "train_value_function.py or pass a model"
+                )
+            model = ValueModel.load()
+        if model.feature_count != get_feature_count(config):
+            raise ValueError(
+                f"Model expects {model.feature_count} features but {config} gives {
+                    get_feature_count(config)
+                }, retrain it for these rules"
+            )
+        self.model = model
+        self.exploration_rate = exploration_rate
+        self.record_positions = record_positions
+        self.recorded_features: list[np.ndarray] = []
+        # Orientations repeat for symmetric pieces so only evaluate each shape once
+        self.unique_orientations_cache: dict[tuple, list[tuple[int, np.ndarray]]] = {}
+
+    @classmethod
+    def get_strategy_fingerprint(cls) -> str:
+        if not os.path.exists(VALUE_WEIGHTS_FILE):
+            return ""
+        return get_file_hash(VALUE_WEIGHTS_FILE)
+
+    def reset_player(self):
+        super().reset_player()
+        self.recorded_features = []
+
+    def get_unique_orientations(self, piece: Piece) -> list[tuple[int, np.ndarray]]:
+        # Keyed by shape so equal pieces from different copies of the piece list
+        # share an entry
+        piece_key = tuple(tuple(row) for row in piece.shape)
+        if piece_key not in self.unique_orientations_cache:
+            seen_shapes = set()
+            unique_orientations = []
+            for j, orientation in enumerate(piece.shape_combinations):
+                shape = np.array(orientation.shape, dtype=bool)
+                shape_key = (shape.shape, shape.tobytes())
+                if shape_key not in seen_shapes:
+                    seen_shapes.add(shape_key)
+                    unique_orientations.append((j, shape))
+            self.unique_orientations_cache[piece_key] = unique_orientations
+        return self.unique_orientations_cache[piece_key]
+
+    def get_state_features(
+        self, button_count: int, income: int, location: int, empty_square_count: int
+    ) -> list[float]:
+        total_time = self.config.total_time_available
+        location = min(location, total_time)
+        paydays_left = sum(
+            1 for payday in self.config.payday_locations if payday > location
+        )
+        square_count = self.config.board_size * self.config.board_size
+        return [
+            button_count / 20,
+            income / 10,
+            location / total_time,
+            empty_square_count / square_count,
+            paydays_left / len(self.config.payday_locations),
+            income * paydays_left / 20,
+            1.0,
+        ]
+
+    def get_next_lookaheads(
+        self, options: list[Piece], option_index: int
+    ) -> list[Piece]:
+        # The window the other players see once this piece has been taken
+        piece = options[option_index]
+        if self.patch_queue is None:
+            return options[option_index + 1:]
+        return self.patch_queue.peek_lookaheads_after_pop(
+            self.patch_queue.get_lookahead_index(piece)
+        )
+
+    def get_lookahead_features(self, next_lookaheads: list[Piece]) -> list[float]:
+        lookahead_features = []
+        for k in range(self.config.pieces_to_lookahead):
+            if k < len(next_lookaheads):
+                piece = next_lookaheads[k]
+                lookahead_features += [
+                    piece.button_cost / 10,
+                    piece.time_cost / 6,
+                    piece.income / 3,
+                    sum(sum(1 for val in row if val) for row in piece.shape) / 8,
+                ]
+            else:
+                lookahead_features += [0.0] * LOOKAHEAD_PIECE_FEATURES
+        return lookahead_features
+
+    def get_payday_income(self, income: int, new_location: int) -> int:
+        return income * sum(
+            1
+            for payday in self.config.payday_locations
+            if self.piece_location < payday <= new_location
+        )
+
+    def build_candidates(
+        self, options: list[Piece]
+    ) -> tuple[np.ndarray, list[tuple[int, int, np.ndarray, np.ndarray]]]:
+        # Candidates stay as one (piece, orientation, xs, ys) entry per block of
+        # feature rows, a PlayerChoice is only built for the one that gets picked
+        board_size = self.config.board_size
+        board = np.array(self.patch_board.board, dtype=bool)
+        board_bits = board.reshape(-1).astype(np.float64)
+        empty_square_count = int(board_size * board_size - board.sum())
+        income = self.patch_board.total_income
+        feature_blocks = []
+        candidate_blocks = []
+        for i, piece in enumerate(options):
+            new_location = self.piece_location + piece.time_cost
+            new_income = income + piece.income
+            tail_features = self.get_state_features(
+                self.button_count
+                - piece.button_cost
+                + self.get_payday_income(new_income, new_location),
+                new_income,
+                new_location,
+                0,
+            ) + self.get_lookahead_features(self.get_next_lookaheads(options, i))
+            for j, shape in self.get_unique_orientations(piece):
+                if shape.shape[0] > board_size or shape.shape[1] > board_size:
+                    continue
+                # OR together the board under each filled square for every top left
+                # corner that keeps the piece on the board
+                corner_rows = board_size - shape.shape[0] + 1
+                corner_cols = board_size - shape.shape[1] + 1
+                filled_rows, filled_cols = np.nonzero(shape)
+                blocked = np.zeros((corner_rows, corner_cols), dtype=bool)
+                for row, col in zip(filled_rows, filled_cols):
+                    blocked |= board[row: row + corner_rows, col: col + corner_cols]
+                xs, ys = np.nonzero(~blocked)
+                if len(xs) == 0:
+                    continue
+                filled_indices = (xs[:, None] + filled_rows) * board_size + (
+                    ys[:, None] + filled_cols
+                )
+                block = np.empty((len(xs), len(board_bits) + len(tail_features)))
+                block[:, : len(board_bits)] = board_bits
+                block[np.arange(len(xs))[:, None], filled_indices] = 1.0
+                block[:, len(board_bits):] = tail_features
+                # Empty square share depends on how many squares this piece fills
+                block[:, len(board_bits) + 3] = (
+                    empty_square_count - len(filled_rows)
+                ) / (board_size * board_size)
+                feature_blocks.append(block)
+                candidate_blocks.append((i, j, xs, ys))
+        if len(feature_blocks) == 0:
+            return np.empty((0, get_feature_count(self.config))), candidate_blocks
+        return np.concatenate(feature_blocks), candidate_blocks
+
+    def make_choice(self, options: list[Piece]) -> PlayerChoice:
+        # Skipping is left to the game loop, which knows how far past the other
+        # players a skip moves this one, so only placements are scored here
+        features, candidate_blocks = self.build_candidates(options)
+        if len(features) == 0:
+            return PlayerChoice(
+                piece_index=GeneralOptions.SKIP.value,
+                piece_orientation_index=-1,
+                location=(-1, -1),
+            )
+        if self.exploration_rate > 0 and random() < self.exploration_rate:
+            chosen_index = randrange(len(features))
+        else:
+            # Every candidate from this turn is scored in a single batched call
+            chosen_index = int(np.argmax(self.model.predict(features)))
+        if self.record_positions:
+            self.recorded_features.append(features[chosen_index])
+        block_offset = chosen_index
+        for piece_index, piece_orientation_index, xs, ys in candidate_blocks:
+            if block_offset < len(xs):
+                return PlayerChoice(
+                    piece_index=piece_index,
+                    piece_orientation_index=piece_orientation_index,
+                    location=(int(xs[block_offset]), int(ys[block_offset])),
+                )
+            block_offset -= len(xs)
+        raise IndexError(f"Candidate {chosen_index} is outside the built blocks")